@@ -103,8 +103,8 @@ class TradingBot:
             logger.info("=" * 60)
 
             # Останавливаем стратегию если активна
-            if strategy_manager.is_strategy_active():
-                logger.info("⏹️ Останавливаем активную стратегию...")
+            if (strategy := strategy_manager.get_if_active()) is not None:
+                logger.info(f"⏹️ Останавливаем активную стратегию {strategy.strategy_name}...")
                 stop_result = await strategy_manager.stop_strategy(reason)
 
                 if stop_result['success']:
@@ -115,6 +115,7 @@ class TradingBot:
             # Выводим финальную статистику
             logger.info("📊 Финальная статистика:")
             db.print_statistics()
+            db.close()
 
             self.is_running = False
             logger.info("👋 Торговый бот остановлен")
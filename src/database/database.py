@@ -1,6 +1,8 @@
 # src/database/database.py
 import sqlite3
-from typing import Optional, Dict, Any, List
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Iterator
 from ..utils.config import config
 from ..utils.logger import logger
 from ..utils.helpers import get_msk_time
@@ -14,9 +16,59 @@ class Database:
         db_path = config.database_url.replace("sqlite:///", "")
         self.db_path = db_path
 
+        # Одно постоянное соединение на весь процесс вместо connect() на каждый вызов
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # Глубина вложенности transaction(): внутри нее отдельные методы не коммитят
+        self._tx_depth = 0
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Получение постоянного соединения с БД (создается при первом обращении)"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Доступ к общему соединению под блокировкой: commit при успехе, rollback при ошибке"""
+        with self._lock:
+            conn = self._get_connection()
+            if self._tx_depth:
+                # Коммит выполнит внешняя transaction()
+                yield conn
+                return
+            with conn:
+                yield conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Явная транзакция: несколько вызовов методов БД с одним commit в конце"""
+        with self._lock:
+            conn = self._get_connection()
+            outermost = self._tx_depth == 0
+            self._tx_depth += 1
+            try:
+                if outermost:
+                    with conn:
+                        yield conn
+                else:
+                    yield conn
+            finally:
+                self._tx_depth -= 1
+
+    def close(self) -> None:
+        """Закрытие постоянного соединения с БД"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def create_tables(self):
         """Создание упрощенных таблиц"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
 
             # ТАБЛИЦА СДЕЛОК - единственная нужная таблица
@@ -56,13 +108,12 @@ class Database:
                     VALUES (1, 'MACD Strategy', FALSE)
                 """)
 
-            conn.commit()
             logger.info("✅ Таблицы базы данных созданы")
 
     # МЕТОДЫ ДЛЯ СТАТУСА СТРАТЕГИИ
     def set_strategy_active(self, strategy_name: str) -> None:
         """Установить стратегию как активную"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE strategy_status 
@@ -73,12 +124,11 @@ class Database:
                     error_message = NULL
                 WHERE id = 1
             """, (strategy_name, get_msk_time().isoformat()))
-            conn.commit()
             logger.info(f"✅ Стратегия '{strategy_name}' отмечена как активная")
 
     def set_strategy_inactive(self, reason: Optional[str] = None) -> None:
         """Установить стратегию как неактивную"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE strategy_status 
@@ -87,13 +137,11 @@ class Database:
                     error_message = ?
                 WHERE id = 1
             """, (get_msk_time().isoformat(), reason))
-            conn.commit()
             logger.info(f"⏹️ Стратегия отмечена как неактивная: {reason or 'Normal stop'}")
 
     def is_strategy_active(self) -> bool:
         """Проверить активна ли стратегия"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT is_active FROM strategy_status WHERE id = 1")
             result = cursor.fetchone()
@@ -101,8 +149,7 @@ class Database:
 
     def get_strategy_status(self) -> Dict[str, Any]:
         """Получить полный статус стратегии"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM strategy_status WHERE id = 1")
             result = cursor.fetchone()
@@ -111,7 +158,7 @@ class Database:
     # МЕТОДЫ ДЛЯ СДЕЛОК
     def create_trade_record(self, symbol: str, side: str, quantity: str, order_id: Optional[str] = None) -> int:
         """Создание записи сделки"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO trades 
@@ -120,14 +167,13 @@ class Database:
             """, (symbol, side, quantity, order_id, get_msk_time().isoformat()))
 
             trade_id = cursor.lastrowid
-            conn.commit()
             logger.info(f"📝 Создана запись сделки ID={trade_id}: {side} {quantity} {symbol}")
             return trade_id
 
     def update_trade_record(self, trade_id: int, exit_price: Optional[float] = None,
                             pnl: Optional[float] = None, status: Optional[str] = None):
         """Обновление записи сделки"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
 
             update_fields = []
@@ -156,13 +202,11 @@ class Database:
                     SET {', '.join(update_fields)}
                     WHERE id = ?
                 """, values)
-                conn.commit()
                 logger.info(f"📝 Обновлена сделка ID={trade_id}: {', '.join(update_fields)}")
 
     def get_trades_history(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Получение истории сделок"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM trades 
@@ -175,8 +219,7 @@ class Database:
 
     def get_statistics(self) -> Dict[str, Any]:
         """Получение статистики торговли"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
 
             # Получаем все сделки
@@ -203,8 +246,7 @@ class Database:
 
     def get_open_trades(self) -> List[Dict[str, Any]]:
         """Получение открытых сделок"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM trades 
@@ -217,7 +259,7 @@ class Database:
     def cleanup_old_data(self, days_to_keep: int = 30):
         """Очистка старых данных"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
 
                 # Удаляем старые закрытые сделки
@@ -228,7 +270,6 @@ class Database:
                 """.format(days_to_keep))
 
                 deleted_trades = cursor.rowcount
-                conn.commit()
 
                 if deleted_trades > 0:
                     logger.info(f"🧹 Удалено {deleted_trades} старых сделок (старше {days_to_keep} дней)")
@@ -239,7 +280,7 @@ class Database:
     def get_database_stats(self) -> Dict[str, Any]:
         """Статистика базы данных"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
 
                 # Считаем сделки
@@ -56,11 +56,15 @@ class BybitClient:
             # Устанавливаем общую сессию
             module.session = shared_session
 
-    async def __aenter__(self):
-        """Async context manager entry"""
+    async def connect(self):
+        """Открытие общей сессии для долгоживущего клиента (закрывается через close())"""
         await self._ensure_modules_use_shared_session()
         return self
 
+    async def __aenter__(self):
+        """Async context manager entry"""
+        return await self.connect()
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
         await self.close()
@@ -114,6 +114,41 @@ class BybitSymbolInfo(BybitBase):
 
         return len(step_str.split('.')[1])
 
+    @staticmethod
+    def format_quantity(quantity: float, precision_info: Dict[str, Any]) -> str:
+        """
+        Форматирование количества по уже полученным данным точности (результат get_quantity_precision)
+        """
+        min_qty = precision_info['min_qty']
+        qty_step = precision_info['qty_step']
+        precision = precision_info['precision']
+
+        # Округляем до нужной точности
+        rounded_qty = round(quantity, precision)
+
+        # Проверяем минимальное количество
+        if rounded_qty < min_qty:
+            logger.warning(f"⚠️ Количество {rounded_qty} меньше минимального {min_qty}, устанавливаем минимум")
+            rounded_qty = min_qty
+
+        # Округляем до ближайшего шага
+        if qty_step > 0:
+            rounded_qty = round(rounded_qty / qty_step) * qty_step
+            # Повторно округляем до точности после операции с шагом
+            rounded_qty = round(rounded_qty, precision)
+
+        # Форматируем как строку
+        if precision == 0:
+            return str(int(rounded_qty))
+
+        formatted = f"{rounded_qty:.{precision}f}"
+        # Убираем лишние нули справа, но оставляем минимум нужной точности
+        formatted = formatted.rstrip('0').rstrip('.')
+        if not formatted or formatted == '.' or float(formatted) < min_qty:
+            formatted = f"{min_qty:.{precision}f}"
+
+        return formatted
+
     async def format_quantity_for_symbol(self, symbol: str, quantity: float) -> Dict[str, Any]:
         """
         Форматирование количества для конкретного символа на основе данных биржи
@@ -125,42 +160,16 @@ class BybitSymbolInfo(BybitBase):
             if not precision_info['success']:
                 return precision_info
 
-            min_qty = precision_info['min_qty']
-            qty_step = precision_info['qty_step']
-            precision = precision_info['precision']
-
-            # Округляем до нужной точности
-            rounded_qty = round(quantity, precision)
-
-            # Проверяем минимальное количество
-            if rounded_qty < min_qty:
-                logger.warning(f"⚠️ Количество {rounded_qty} меньше минимального {min_qty}, устанавливаем минимум")
-                rounded_qty = min_qty
-
-            # Округляем до ближайшего шага
-            if qty_step > 0:
-                rounded_qty = round(rounded_qty / qty_step) * qty_step
-                # Повторно округляем до точности после операции с шагом
-                rounded_qty = round(rounded_qty, precision)
-
-            # Форматируем как строку
-            if precision == 0:
-                formatted = str(int(rounded_qty))
-            else:
-                formatted = f"{rounded_qty:.{precision}f}"
-                # Убираем лишние нули справа, но оставляем минимум нужной точности
-                formatted = formatted.rstrip('0').rstrip('.')
-                if not formatted or formatted == '.' or float(formatted) < min_qty:
-                    formatted = f"{min_qty:.{precision}f}"
+            formatted = self.format_quantity(quantity, precision_info)
 
             return {
                 'success': True,
                 'symbol': symbol,
                 'original_quantity': quantity,
                 'formatted_quantity': formatted,
-                'min_qty': min_qty,
-                'qty_step': qty_step,
-                'precision': precision
+                'min_qty': precision_info['min_qty'],
+                'qty_step': precision_info['qty_step'],
+                'precision': precision_info['precision']
             }
 
         except Exception as e:
@@ -1,8 +1,12 @@
 # src/strategy/macd.py
 import asyncio
-from typing import Dict, Any, Optional, Union
+import logging
+import sys
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
 from enum import Enum
-from datetime import datetime, timedelta
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
 from ..indicators.macd_5m import MACD5mIndicator
 from ..indicators.macd_45m import MACD45mIndicator
 from ..exchange.bybit import BybitClient
@@ -11,6 +15,20 @@ from ..utils.logger import logger
 from ..utils.helpers import get_msk_time, format_msk_time
 
 
+# Длительность интервала поддерживаемых таймфреймов в секундах
+INTERVAL_SECONDS = {
+    '5m': 5 * 60,
+    '45m': 45 * 60
+}
+
+# Разделитель блока статуса стратегии
+_STATUS_SEPARATOR = "=" * 60
+
+# Фрагменты ошибок закрытия, означающие что позиции уже нет
+# ("не найдена" - ответ BybitPositions.close_position при отсутствии открытой позиции)
+POSITION_CLOSED_MARKERS = ("position not found", "position size is zero", "не найдена")
+
+
 class PositionState(Enum):
     """Состояние позиции в стратегии"""
     NO_POSITION = "no_position"
@@ -26,6 +44,18 @@ class StrategyState(Enum):
     WAITING_REVERSE_SIGNAL = "waiting_reverse_signal"
 
 
+@dataclass(slots=True, frozen=True)
+class FirstSignal:
+    """Поля сигнала, нужные после открытия позиции (без копии всего словаря сигнала)"""
+    type: str
+    price: Optional[float]
+    timestamp: Optional[datetime]
+
+    @classmethod
+    def from_signal(cls, signal: Dict[str, Any]) -> "FirstSignal":
+        return cls(signal['type'], signal.get('price'), signal.get('timestamp'))
+
+
 class MACDStrategy:
     """MACD стратегия"""
 
@@ -45,9 +75,27 @@ class MACDStrategy:
         self.leverage = config.leverage
         self.position_size_usdt = config.position_size_usdt
 
+        # Параметры стратегии не меняются за время работы - собираем один раз для статуса
+        self._settings_summary: Dict[str, Any] = {
+            'strategy_name': self.strategy_name,
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'position_size_usdt': self.position_size_usdt,
+            'leverage': self.leverage,
+            'indicator_engine': f'MACD {self.timeframe}'
+        }
+
+        # Требования биржи к количеству (min_qty, qty_step, precision), загружаются один раз
+        self.qty_precision: Optional[Dict[str, Any]] = None
+
+        # Кэш цены с биржи (monotonic время, цена) на случай расчета без цены сигнала
+        self._price_cache: Optional[Tuple[float, float]] = None
+        self.price_cache_ttl = 0.5
+
         # Параметры повторных попыток
         self.retry_attempts = 3
-        self.retry_delay = 1.0
+        self.retry_delay = 0.1
+        self.retry_backoff = 3
 
         # Время запуска
         self.start_time: Optional[datetime] = None
@@ -60,10 +108,24 @@ class MACDStrategy:
 
         # Логика интервалов и пересечений
         self.current_interval_start: Optional[datetime] = None
-        self.first_signal_in_interval: Optional[Dict[str, Any]] = None
+        self.interval_seconds = INTERVAL_SECONDS.get(self.timeframe)
+        self._last_bucket_id: Optional[int] = None
+        self.first_signal_in_interval: Optional[FirstSignal] = None
         self.last_interval_macd_state: Optional[Dict[str, Any]] = None
         self.signals_blocked_until_interval_close = False
 
+        # Обработчики сигнала для состояний алгоритма, в которых сигнал что-то меняет
+        self._state_handlers = {
+            StrategyState.WAITING_FIRST_SIGNAL: self._handle_first_signal_in_interval,
+            StrategyState.WAITING_REVERSE_SIGNAL: self._handle_reverse_signal
+        }
+
+        # Event loop стратегии: в нем живет сессия Bybit клиента, туда же передаются сигналы
+        # индикатора (WebSocket вызывает callback из своего потока)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Сигналы обрабатываются строго по одному, как раньше в потоке WebSocket
+        self._signal_lock = asyncio.Lock()
+
         # Защита от частых операций
         self.min_operation_interval_seconds = 5
         self.last_operation_time: Optional[datetime] = None
@@ -78,26 +140,32 @@ class MACDStrategy:
             # Валидация конфигурации
             config.validate()
 
-            # Инициализируем Bybit клиент
-            self.bybit_client = BybitClient(config.bybit_api_key, config.bybit_secret_key)
+            # Инициализируем Bybit клиент с общей сессией на все время работы стратегии
+            # Клиент переиспользуется между перезапусками, заново открывается только сессия
+            if self.bybit_client is None:
+                self.bybit_client = BybitClient(config.bybit_api_key, config.bybit_secret_key)
+            await self.bybit_client.connect()
+
+            # Тест подключения, установка плеча и тестовый расчет размера позиции
+            # независимы друг от друга - выполняем параллельно
+            connection_test, leverage_result, test_position_size = await asyncio.gather(
+                self.bybit_client.balance.test_connection(),
+                self.bybit_client.leverage.set_leverage(self.symbol, self.leverage),
+                self._calculate_position_size(),
+                return_exceptions=True
+            )
 
-            # Тестируем подключение
-            async with self.bybit_client as client:
-                connection_test = await client.balance.test_connection()
-                if not connection_test:
-                    raise Exception("Не удалось подключиться к Bybit API")
+            if connection_test is not True:
+                raise Exception("Не удалось подключиться к Bybit API")
 
-            # Устанавливаем плечо
-            async with self.bybit_client as client:
-                leverage_result = await client.leverage.set_leverage(self.symbol, self.leverage)
-                if leverage_result['success']:
-                    logger.info(f"⚡ Плечо {self.leverage}x установлено для {self.symbol}")
-                else:
-                    logger.info(f"⚡ Плечо {self.leverage}x уже было установлено для {self.symbol}")
+            if isinstance(leverage_result, BaseException):
+                raise leverage_result
+            if leverage_result['success']:
+                logger.info(f"⚡ Плечо {self.leverage}x установлено для {self.symbol}")
+            else:
+                logger.info(f"⚡ Плечо {self.leverage}x уже было установлено для {self.symbol}")
 
-            # Тестируем расчет размера позиции
-            test_position_size = await self._calculate_position_size()
-            if not test_position_size:
+            if isinstance(test_position_size, BaseException) or not test_position_size:
                 raise Exception("Не удалось рассчитать размер позиции")
 
             logger.info(f"✅ Тестовый размер позиции: {test_position_size}")
@@ -118,6 +186,7 @@ class MACDStrategy:
         except Exception as e:
             logger.error(f"❌ Ошибка инициализации MACD стратегии: {e}")
             self.error_message = str(e)
+            await self._close_client()
             return False
 
     async def start(self) -> bool:
@@ -127,6 +196,10 @@ class MACDStrategy:
                 logger.warning("⚠️ Стратегия уже запущена")
                 return False
 
+            # Сбрасываем состояние предыдущего запуска
+            self.reset()
+            self._loop = asyncio.get_running_loop()
+
             # Инициализируем если еще не инициализирована
             if not await self.initialize():
                 return False
@@ -134,17 +207,10 @@ class MACDStrategy:
             self.start_time = get_msk_time()
             self.is_active = True
 
-            # Сбрасываем состояние стратегии
-            self.strategy_state = StrategyState.WAITING_FIRST_SIGNAL
-            self.current_interval_start = None
-            self.first_signal_in_interval = None
-            self.last_interval_macd_state = None
-            self.signals_blocked_until_interval_close = False
-
             logger.info(f"🚀 Запуск MACD стратегии")
 
             # Добавляем callback для MACD сигналов
-            self.macd_indicator.add_callback(self._handle_macd_signal)
+            self.macd_indicator.add_callback(self._on_macd_signal)
 
             # Запускаем MACD индикатор
             await self.macd_indicator.start()
@@ -164,8 +230,29 @@ class MACDStrategy:
             logger.error(f"❌ Ошибка запуска MACD стратегии: {e}")
             self.error_message = str(e)
             self.is_active = False
+            await self._close_client()
             return False
 
+    def reset(self):
+        """Сброс состояния запуска без пересоздания клиента Bybit (для повторного start())"""
+        self.position_state = PositionState.NO_POSITION
+        self.strategy_state = StrategyState.WAITING_FIRST_SIGNAL
+        self.start_time = None
+        self.error_message = None
+
+        self.total_signals_received = 0
+        self.signals_processed = 0
+        self.last_signal_time = None
+
+        self.current_interval_start = None
+        self._last_bucket_id = None
+        self.first_signal_in_interval = None
+        self.last_interval_macd_state = None
+        self.signals_blocked_until_interval_close = False
+
+        self._price_cache = None
+        self.last_operation_time = None
+
     async def stop(self, reason: str = "Manual stop") -> bool:
         """Остановка стратегии"""
         try:
@@ -181,7 +268,8 @@ class MACDStrategy:
             self.is_active = False
 
             # Закрываем соединения
-            await self._cleanup()
+            await self._close_client()
+            self._cleanup()
 
             # Логируем статистику
             logger.info(
@@ -195,7 +283,12 @@ class MACDStrategy:
             logger.error(f"❌ Ошибка остановки MACD стратегии: {e}")
             return False
 
-    async def _cleanup(self):
+    async def _close_client(self):
+        """Закрытие общей HTTP сессии Bybit клиента"""
+        if self.bybit_client:
+            await self.bybit_client.close()
+
+    def _cleanup(self):
         """Очистка ресурсов"""
         try:
             if self.macd_indicator:
@@ -204,40 +297,54 @@ class MACDStrategy:
         except Exception as e:
             logger.error(f"❌ Ошибка очистки ресурсов: {e}")
 
-    def _is_new_interval(self, signal_timestamp: datetime) -> bool:
+    def _get_interval_bucket(self, signal_timestamp: datetime) -> int:
+        """Номер интервала таймфрейма от начала эпохи (наивное время считается UTC, как в индикаторах)"""
+        if signal_timestamp.tzinfo is None:
+            signal_timestamp = signal_timestamp.replace(tzinfo=timezone.utc)
+        return int(signal_timestamp.timestamp()) // self.interval_seconds
+
+    def _is_new_interval(self, signal_timestamp: datetime, bucket: Optional[int] = None) -> bool:
         """Проверка начала нового интервала"""
-        if self.timeframe == '5m':
-            current_interval_minute = (signal_timestamp.minute // 5) * 5
-            current_interval_start = signal_timestamp.replace(
-                minute=current_interval_minute,
-                second=0,
-                microsecond=0
-            )
-        elif self.timeframe == '45m':
-            if hasattr(self.macd_indicator, 'get_45m_interval_start'):
-                current_interval_start = self.macd_indicator.get_45m_interval_start(signal_timestamp)
-            else:
-                day_start = signal_timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
-                minutes_from_start = (signal_timestamp - day_start).total_seconds() / 60
-                interval_number = int(minutes_from_start // 45)
-                current_interval_start = day_start + timedelta(minutes=interval_number * 45)
-        else:
+        if bucket is None:
+            bucket = self._get_interval_bucket(signal_timestamp)
+
+        if bucket == self._last_bucket_id:
             return False
 
-        if self.current_interval_start is None:
-            self.current_interval_start = current_interval_start
+        self._last_bucket_id = bucket
+
+        # datetime начала интервала строим только при смене интервала
+        current_interval_start = datetime.fromtimestamp(
+            bucket * self.interval_seconds, tz=signal_timestamp.tzinfo or timezone.utc
+        )
+        if signal_timestamp.tzinfo is None:
+            current_interval_start = current_interval_start.replace(tzinfo=None)
+
+        old_interval = self.current_interval_start
+        self.current_interval_start = current_interval_start
+
+        if old_interval is None:
             logger.info(
                 f"🎯 Инициализация: текущий {self.timeframe} интервал {current_interval_start.strftime('%H:%M')}")
             return False
-        elif self.current_interval_start != current_interval_start:
-            old_interval = self.current_interval_start
-            self.current_interval_start = current_interval_start
 
-            logger.info(
-                f"🔄 Новый {self.timeframe} интервал: {old_interval.strftime('%H:%M')} -> {current_interval_start.strftime('%H:%M')}")
-            return True
+        logger.info(
+            f"🔄 Новый {self.timeframe} интервал: {old_interval.strftime('%H:%M')} -> {current_interval_start.strftime('%H:%M')}")
+        return True
+
+    def _on_macd_signal(self, signal: Dict[str, Any]):
+        """Callback индикатора: передача сигнала в event loop стратегии из любого потока"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            logger.warning("⚠️ Получен сигнал, но event loop стратегии недоступен")
+            return
 
-        return False
+        asyncio.run_coroutine_threadsafe(self._process_signal(signal), loop)
+
+    async def _process_signal(self, signal: Dict[str, Any]):
+        """Последовательная обработка сигналов в event loop стратегии"""
+        async with self._signal_lock:
+            await self._handle_macd_signal(signal)
 
     async def _handle_macd_signal(self, signal: Dict[str, Any]):
         """Обработка сигналов MACD"""
@@ -249,22 +356,27 @@ class MACDStrategy:
             self.total_signals_received += 1
             self.last_signal_time = get_msk_time()
 
-            signal_type = signal.get('type')
-            price = signal.get('price')
-            crossover_type = signal.get('crossover_type')
-            timeframe = signal.get('timeframe')
             signal_timestamp = signal.get('timestamp')
+            bucket = self._get_interval_bucket(signal_timestamp)
 
-            current_time_msk = format_msk_time()
-            logger.info(
-                f"🎯 MACD сигнал #{self.total_signals_received}: {signal_type.upper()} ({crossover_type}) "
-                f"при цене {price} (TF: {timeframe})"
-            )
-            logger.info(
-                f"📊 Позиция: {self.position_state.value} | Алгоритм: {self.strategy_state.value} | Время: {current_time_msk} МСК")
+            # Позиция уже открыта в этом интервале: до его закрытия сигналы ничего не меняют
+            if self.signals_blocked_until_interval_close and bucket == self._last_bucket_id:
+                return
+
+            # Подробный лог сигнала собираем только если INFO действительно пишется
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "🎯 MACD сигнал #%d: %s (%s) при цене %s (TF: %s)",
+                    self.total_signals_received, signal['type'].upper(), signal.get('crossover_type'),
+                    signal.get('price'), signal.get('timeframe')
+                )
+                logger.info(
+                    "📊 Позиция: %s | Алгоритм: %s | Время: %s МСК",
+                    self.position_state.value, self.strategy_state.value, format_msk_time(self.last_signal_time)
+                )
 
             # Проверяем новый ли это интервал
-            is_new_interval = self._is_new_interval(signal_timestamp)
+            is_new_interval = self._is_new_interval(signal_timestamp, bucket)
 
             if is_new_interval:
                 await self._handle_new_interval()
@@ -274,23 +386,23 @@ class MACDStrategy:
                 time_since_last = (get_msk_time() - self.last_operation_time).total_seconds()
                 if time_since_last < self.min_operation_interval_seconds:
                     logger.warning(
-                        f"⚠️ Операция проигнорирована (защита): {time_since_last:.1f}с < {self.min_operation_interval_seconds}с"
+                        "⚠️ Операция проигнорирована (защита): %.1fс < %sс",
+                        time_since_last, self.min_operation_interval_seconds
                     )
                     return
 
             # Обрабатываем сигнал в зависимости от состояния стратегии
-            if self.strategy_state == StrategyState.WAITING_FIRST_SIGNAL:
-                await self._handle_first_signal_in_interval(signal)
-            elif self.strategy_state == StrategyState.WAITING_REVERSE_SIGNAL:
-                await self._handle_reverse_signal(signal)
+            handler = self._state_handlers.get(self.strategy_state)
+            if handler:
+                await handler(signal)
             else:
-                logger.info(f"🔒 Сигнал проигнорирован: состояние {self.strategy_state.value}")
+                logger.info("🔒 Сигнал проигнорирован: состояние %s", self.strategy_state.value)
 
             self.signals_processed += 1
-            logger.info(f"✅ Сигнал #{self.signals_processed} обработан")
+            logger.info("✅ Сигнал #%d обработан", self.signals_processed)
 
         except Exception as e:
-            logger.error(f"❌ Ошибка обработки MACD сигнала: {e}")
+            logger.error("❌ Ошибка обработки MACD сигнала: %s", e)
 
     async def _handle_new_interval(self):
         """Обработка начала нового интервала"""
@@ -310,7 +422,7 @@ class MACDStrategy:
         """Обработка первого сигнала в интервале"""
         logger.info("🥇 Первый сигнал в интервале - открываем позицию")
 
-        self.first_signal_in_interval = signal.copy()
+        self.first_signal_in_interval = FirstSignal.from_signal(signal)
 
         if signal['type'] == 'buy':
             success = await self._open_long_position(signal)
@@ -332,7 +444,7 @@ class MACDStrategy:
             logger.warning("⚠️ Нет сохраненного первого сигнала для сравнения")
             return
 
-        first_signal_type = self.first_signal_in_interval['type']
+        first_signal_type = self.first_signal_in_interval.type
         current_signal_type = signal['type']
 
         if first_signal_type != current_signal_type:
@@ -350,7 +462,7 @@ class MACDStrategy:
                     self.position_state = PositionState.LONG_POSITION
 
             if success:
-                self.first_signal_in_interval = signal.copy()
+                self.first_signal_in_interval = FirstSignal.from_signal(signal)
                 self.strategy_state = StrategyState.POSITION_OPENED
                 self.signals_blocked_until_interval_close = True
                 logger.info("✅ Позиция развернута, ждем закрытия интервала")
@@ -368,7 +480,7 @@ class MACDStrategy:
 
         current_macd = current_macd_values['macd_line']
         current_signal_line = current_macd_values['signal_line']
-        first_signal_type = self.first_signal_in_interval['type']
+        first_signal_type = self.first_signal_in_interval.type
 
         if first_signal_type == 'buy':
             is_confirmed = current_macd > current_signal_line
@@ -401,7 +513,7 @@ class MACDStrategy:
             success = await self._open_short_position(reverse_signal)
             if success:
                 self.position_state = PositionState.SHORT_POSITION
-                self.first_signal_in_interval = reverse_signal.copy()
+                self.first_signal_in_interval = FirstSignal.from_signal(reverse_signal)
 
         elif self.position_state == PositionState.SHORT_POSITION:
             logger.info("🔄 Разворот: SHORT -> LONG")
@@ -414,7 +526,7 @@ class MACDStrategy:
             success = await self._open_long_position(reverse_signal)
             if success:
                 self.position_state = PositionState.LONG_POSITION
-                self.first_signal_in_interval = reverse_signal.copy()
+                self.first_signal_in_interval = FirstSignal.from_signal(reverse_signal)
 
         self.strategy_state = StrategyState.POSITION_OPENED
         self.signals_blocked_until_interval_close = True
@@ -423,18 +535,17 @@ class MACDStrategy:
     async def _open_long_position(self, signal: Dict[str, Any]) -> bool:
         """Открытие лонг позиции"""
         try:
-            current_position_size = await self._calculate_position_size()
+            current_position_size = await self._calculate_position_size(price_hint=signal.get('price'))
             if not current_position_size:
                 logger.error("❌ Не удалось рассчитать размер позиции")
                 return False
 
             logger.info(f"💹 Открываем LONG: {current_position_size} при цене {signal['price']}")
 
-            async with self.bybit_client as client:
-                result = await client.orders.buy_market(
-                    symbol=self.symbol,
-                    qty=current_position_size
-                )
+            result = await self.bybit_client.orders.buy_market(
+                symbol=self.symbol,
+                qty=current_position_size
+            )
 
             if result['success']:
                 logger.info(f"✅ LONG позиция открыта: {result['order_id']}")
@@ -452,18 +563,17 @@ class MACDStrategy:
     async def _open_short_position(self, signal: Dict[str, Any]) -> bool:
         """Открытие шорт позиции"""
         try:
-            current_position_size = await self._calculate_position_size()
+            current_position_size = await self._calculate_position_size(price_hint=signal.get('price'))
             if not current_position_size:
                 logger.error("❌ Не удалось рассчитать размер позиции")
                 return False
 
             logger.info(f"💹 Открываем SHORT: {current_position_size} при цене {signal['price']}")
 
-            async with self.bybit_client as client:
-                result = await client.orders.sell_market(
-                    symbol=self.symbol,
-                    qty=current_position_size
-                )
+            result = await self.bybit_client.orders.sell_market(
+                symbol=self.symbol,
+                qty=current_position_size
+            )
 
             if result['success']:
                 logger.info(f"✅ SHORT позиция открыта: {result['order_id']}")
@@ -482,8 +592,7 @@ class MACDStrategy:
         """Закрытие позиции с повторными попытками"""
         for attempt in range(1, self.retry_attempts + 1):
             try:
-                async with self.bybit_client as client:
-                    result = await client.positions.close_position(self.symbol)
+                result = await self.bybit_client.positions.close_position(self.symbol)
 
                 if result['success']:
                     logger.info(f"✅ {position_type} позиция закрыта")
@@ -492,7 +601,8 @@ class MACDStrategy:
                 else:
                     error_msg = result.get('error', 'Unknown error')
 
-                    if "position" in error_msg.lower() and "not found" in error_msg.lower():
+                    error_msg_lower = error_msg.lower()
+                    if any(marker in error_msg_lower for marker in POSITION_CLOSED_MARKERS):
                         logger.info(f"📊 Позиция уже закрыта: {error_msg}")
                         return True
 
@@ -502,21 +612,44 @@ class MACDStrategy:
                 logger.error(f"❌ Исключение при закрытии позиции (попытка {attempt}): {e}")
 
             if attempt < self.retry_attempts:
-                await asyncio.sleep(self.retry_delay)
+                # Экспоненциальная задержка: 0.1с, 0.3с, 0.9с...
+                await asyncio.sleep(self.retry_delay * self.retry_backoff ** (attempt - 1))
 
         logger.error(f"❌ Не удалось закрыть {position_type} позицию за {self.retry_attempts} попыток")
         return False
 
-    async def _calculate_position_size(self) -> Optional[str]:
+    async def _get_current_price(self, price_hint: Optional[float] = None) -> float:
+        """Цена для расчета позиции: цена сигнала, недавняя цена из кэша или запрос к бирже"""
+        if price_hint:
+            return price_hint
+
+        now = time.monotonic()
+        if self._price_cache and now - self._price_cache[0] < self.price_cache_ttl:
+            return self._price_cache[1]
+
+        price_result = await self.bybit_client.price.get_price(self.symbol)
+        if not price_result['success']:
+            raise Exception(f"Не удалось получить цену {self.symbol}")
+
+        self._price_cache = (now, price_result['price'])
+        return price_result['price']
+
+    async def _calculate_position_size(self, price_hint: Optional[float] = None) -> Optional[str]:
         """Расчет размера позиции"""
         try:
-            # Получаем актуальную цену
-            async with self.bybit_client as client:
-                price_result = await client.price.get_price(self.symbol)
-                if not price_result['success']:
-                    raise Exception(f"Не удалось получить цену {self.symbol}")
+            if self.qty_precision is None:
+                # Первый расчет: цена и требования биржи к количеству параллельно
+                current_price, precision_info = await asyncio.gather(
+                    self._get_current_price(price_hint),
+                    self.bybit_client.symbol_info.get_quantity_precision(self.symbol)
+                )
+                if not precision_info['success']:
+                    raise Exception(f"Не удалось получить точность количества {self.symbol}: {precision_info['error']}")
 
-                current_price = price_result['price']
+                # Фильтр лота не меняется за время работы стратегии - кэшируем
+                self.qty_precision = precision_info
+            else:
+                current_price = await self._get_current_price(price_hint)
 
             # Используем фиксированную сумму из конфигурации
             usdt_amount = self.position_size_usdt
@@ -528,13 +661,7 @@ class MACDStrategy:
             quantity = total_volume_usdt / current_price
 
             # Форматируем с учетом требований биржи
-            async with self.bybit_client as client:
-                format_result = await client.symbol_info.format_quantity_for_symbol(self.symbol, quantity)
-
-                if not format_result['success']:
-                    raise Exception(f"Ошибка форматирования количества: {format_result['error']}")
-
-                return format_result['formatted_quantity']
+            return self.bybit_client.symbol_info.format_quantity(quantity, self.qty_precision)
 
         except Exception as e:
             logger.error(f"❌ Ошибка расчета размера позиции: {e}")
@@ -543,11 +670,12 @@ class MACDStrategy:
     async def _determine_initial_position_state(self):
         """Определение начального состояния позиции"""
         try:
-            async with self.bybit_client as client:
-                positions_result = await client.positions.get_positions(self.symbol)
+            positions_result = await self.bybit_client.positions.get_positions(self.symbol)
 
-            if positions_result['success'] and positions_result['positions']:
-                position = positions_result['positions'][0]
+            positions = positions_result.get('positions')
+
+            if positions_result.get('success') and positions:
+                position = positions[0]
                 side = position['side']
                 size = position['size']
 
@@ -572,14 +700,10 @@ class MACDStrategy:
     def get_status_info(self) -> Dict[str, Any]:
         """Получение информации о статусе стратегии"""
         return {
-            'strategy_name': self.strategy_name,
+            **self._settings_summary,
             'is_active': self.is_active,
             'position_state': self.position_state.value,
             'strategy_state': self.strategy_state.value,
-            'symbol': self.symbol,
-            'timeframe': self.timeframe,
-            'position_size_usdt': self.position_size_usdt,
-            'leverage': self.leverage,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'error_message': self.error_message,
             'total_signals_received': self.total_signals_received,
@@ -587,25 +711,32 @@ class MACDStrategy:
             'last_signal_time': self.last_signal_time.isoformat() if self.last_signal_time else None,
             'current_interval_start': self.current_interval_start.isoformat() if self.current_interval_start else None,
             'signals_blocked': self.signals_blocked_until_interval_close,
-            'first_signal_in_interval': self.first_signal_in_interval,
-            'indicator_engine': f'MACD {self.timeframe}'
+            'first_signal_in_interval': asdict(self.first_signal_in_interval) if self.first_signal_in_interval else None
         }
 
-    def print_status(self):
-        """Вывод статуса в консоль"""
-        print("\n" + "=" * 60)
-        print("СТАТУС MACD СТРАТЕГИИ")
-        print("=" * 60)
-        print(f"Статус: {'🟢 АКТИВНА' if self.is_active else '🔴 ОСТАНОВЛЕНА'}")
-        print(f"Символ: {self.symbol}")
-        print(f"Таймфрейм: {self.timeframe}")
-        print(f"Размер позиции: {self.position_size_usdt} USDT (плечо {self.leverage}x)")
-        print(f"Состояние позиции: {self.position_state.value}")
-        print(f"Состояние алгоритма: {self.strategy_state.value}")
-        print(f"Всего сигналов: {self.total_signals_received}")
-        print(f"Обработано: {self.signals_processed}")
+    def get_status_lines(self) -> List[str]:
+        """Строки статуса для вывода в консоль"""
+        lines = [
+            "",
+            _STATUS_SEPARATOR,
+            "СТАТУС MACD СТРАТЕГИИ",
+            _STATUS_SEPARATOR,
+            f"Статус: {'🟢 АКТИВНА' if self.is_active else '🔴 ОСТАНОВЛЕНА'}",
+            f"Символ: {self.symbol}",
+            f"Таймфрейм: {self.timeframe}",
+            f"Размер позиции: {self.position_size_usdt} USDT (плечо {self.leverage}x)",
+            f"Состояние позиции: {self.position_state.value}",
+            f"Состояние алгоритма: {self.strategy_state.value}",
+            f"Всего сигналов: {self.total_signals_received}",
+            f"Обработано: {self.signals_processed}"
+        ]
         if self.last_signal_time:
-            print(f"Последний сигнал: {format_msk_time(self.last_signal_time)}")
+            lines.append(f"Последний сигнал: {format_msk_time(self.last_signal_time)}")
         if self.error_message:
-            print(f"Ошибка: {self.error_message}")
-        print("=" * 60)
\ No newline at end of file
+            lines.append(f"Ошибка: {self.error_message}")
+        lines.append(_STATUS_SEPARATOR)
+        return lines
+
+    def print_status(self):
+        """Вывод статуса в консоль одной записью"""
+        sys.stdout.write("\n".join(self.get_status_lines()) + "\n")
@@ -1,186 +1,299 @@
 # src/strategy/strategy_manager.py
-from typing import Optional, Dict, Any
+import sys
+import time
+from typing import Optional, Dict, Any, Tuple
 from .macd import MACDStrategy
 from ..utils.logger import logger
-from ..utils.config import config
+from ..utils.config import config, CONFIG_SUMMARY
+from ..database.database import db
+
+# Шаблоны ответов менеджера: в каждом вызове копируются и дополняются полями
+_START_OK_TEMPLATE = {'success': True, 'strategy_name': None, 'message': None, 'config': None}
+_STOP_OK_TEMPLATE = {'success': True, 'strategy_name': None, 'message': None}
+_ERROR_TEMPLATE = {'success': False, 'error': None}
+
+# Тексты сообщений менеджера
+_MSG_ALREADY_RUNNING = 'Стратегия уже запущена: {}'
+_MSG_START_IN_PROGRESS = 'Стратегия уже запускается'
+_MSG_NO_ACTIVE = 'Нет активной стратегии для остановки'
+_MSG_START_ERROR = 'Ошибка запуска: {}'
+_MSG_CRITICAL_ERROR = 'Критическая ошибка: {}'
+_MSG_STARTED = 'Стратегия {} успешно запущена!'
+_MSG_STOPPED = 'Стратегия {} остановлена'
+_MSG_STOPPED_WITH_WARNINGS = 'Стратегия {} остановлена (с предупреждениями)'
+_MSG_STOP_ERROR = 'Ошибка остановки: {}'
+_MSG_RESTART_STOP_FAILED = 'Не удалось остановить для перезапуска: {}'
+_MSG_RESTARTED = 'Стратегия перезапущена: {}'
+
+# Статичные строки вывода статуса (конфигурация не меняется за время работы)
+_STATUS_SEPARATOR = "=" * 70
+_CONFIG_STATUS_LINES = (
+    "",
+    "⚙️ КОНФИГУРАЦИЯ:",
+    f"Символ: {config.trading_pair}",
+    f"Таймфрейм: {config.timeframe}",
+    f"Плечо: {config.leverage}x",
+    f"Размер позиции: {config.position_size_usdt} USDT"
+)
+
+
+def _response(template: Dict[str, Any], **fields: Any) -> Dict[str, Any]:
+    """Ответ менеджера на основе шаблона"""
+    response = template.copy()
+    response.update(fields)
+    return response
 
 
 class StrategyManager:
     """менеджер для управления одной MACD стратегией"""
 
+    __slots__ = ('strategy', '_db_status_cache', '_starting')
+
     def __init__(self):
         # Одна глобальная стратегия
         self.strategy: Optional[MACDStrategy] = None
 
+        # Кэш статуса из БД: (monotonic время, статус)
+        self._db_status_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
+        # Идет запуск: стратегия станет активной только после initialize()
+        self._starting = False
+
+    def _get_db_status_cached(self, ttl: float = 1.0) -> Dict[str, Any]:
+        """Статус стратегии из БД с кэшированием на ttl секунд"""
+        now = time.monotonic()
+        cached = self._db_status_cache
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+
+        db_status = db.get_strategy_status()
+        self._db_status_cache = (now, db_status)
+        return db_status
+
+    def _invalidate_db_status(self) -> None:
+        """Сброс кэша статуса после записи в БД"""
+        self._db_status_cache = None
+
     async def start_strategy(self) -> Dict[str, Any]:
         """Запуск MACD стратегии"""
-        try:
-            # Проверяем что стратегия не запущена
-            if self.strategy is not None:
-                return {
-                    'success': False,
-                    'error': f'Стратегия уже запущена: {self.strategy.strategy_name}'
-                }
+        # Проверяем что стратегия не запущена
+        if self.is_strategy_active():
+            return _response(_ERROR_TEMPLATE, error=_MSG_ALREADY_RUNNING.format(self.strategy.strategy_name))
+
+        # Повторный вызов во время запуска отклоняем: иначе тот же экземпляр
+        # инициализируется второй раз и первый индикатор останется работать
+        if self._starting:
+            return _response(_ERROR_TEMPLATE, error=_MSG_START_IN_PROGRESS)
 
-            logger.info(f"🚀 Запуск MACD стратегии")
+        logger.info("🚀 Запуск MACD стратегии")
 
-            # Создаем экземпляр стратегии
-            self.strategy = MACDStrategy()
+        self._starting = True
+        try:
+            # Остановленный экземпляр переиспользуем, новый создаем только при первом запуске
+            if self.strategy is None:
+                self.strategy = MACDStrategy()
 
             # Запускаем стратегию
             start_success = await self.strategy.start()
 
-            if start_success:
-                logger.info(f"✅ MACD стратегия успешно запущена")
-
-                return {
-                    'success': True,
-                    'strategy_name': self.strategy.strategy_name,
-                    'message': f'Стратегия {self.strategy.strategy_name} успешно запущена!',
-                    'config': {
-                        'symbol': config.trading_pair,
-                        'timeframe': config.timeframe,
-                        'leverage': config.leverage,
-                        'position_size': f"{config.position_size_usdt} USDT"
-                    }
-                }
-            else:
-                error_msg = self.strategy.error_message or 'Неизвестная ошибка при запуске'
-                logger.error(f"❌ Не удалось запустить MACD стратегию: {error_msg}")
-
-                # Очищаем стратегию при ошибке
-                self.strategy = None
-
-                return {
-                    'success': False,
-                    'error': f'Ошибка запуска: {error_msg}'
-                }
-
         except Exception as e:
-            logger.error(f"❌ Исключение при запуске MACD стратегии: {e}")
+            logger.error("❌ Исключение при запуске MACD стратегии: %s", e)
 
-            # Очищаем стратегию при ошибке
+            # Критическая ошибка: экземпляр не переиспользуем
             self.strategy = None
 
-            return {
-                'success': False,
-                'error': f'Критическая ошибка: {str(e)}'
-            }
+            return _response(_ERROR_TEMPLATE, error=_MSG_CRITICAL_ERROR.format(e))
+
+        finally:
+            self._starting = False
+
+        strategy_name = self.strategy.strategy_name
+
+        if not start_success:
+            error_msg = self.strategy.error_message or 'Неизвестная ошибка при запуске'
+            logger.error("❌ Не удалось запустить MACD стратегию: %s", error_msg)
+
+            return _response(_ERROR_TEMPLATE, error=_MSG_START_ERROR.format(error_msg))
+
+        logger.info("✅ MACD стратегия успешно запущена")
+
+        # Стратегия уже работает: ошибка записи статуса в БД ее не отменяет
+        self._mark_db_active(strategy_name)
+
+        return _response(
+            _START_OK_TEMPLATE,
+            strategy_name=strategy_name,
+            message=_MSG_STARTED.format(strategy_name),
+            config=dict(CONFIG_SUMMARY)
+        )
 
     async def stop_strategy(self, reason: str = "Manual stop") -> Dict[str, Any]:
         """Остановка стратегии"""
-        try:
-            # Проверяем есть ли активная стратегия
-            if self.strategy is None:
-                return {
-                    'success': False,
-                    'error': 'Нет активной стратегии для остановки'
-                }
+        # Проверяем есть ли активная стратегия
+        strategy = self.get_if_active()
+        if strategy is None:
+            return _response(_ERROR_TEMPLATE, error=_MSG_NO_ACTIVE)
 
-            strategy_name = self.strategy.strategy_name
+        strategy_name = strategy.strategy_name
 
-            logger.info(f"⏹️ Остановка стратегии {strategy_name}: {reason}")
+        logger.info("⏹️ Остановка стратегии %s: %s", strategy_name, reason)
 
+        try:
             # Останавливаем стратегию
-            stop_success = await self.strategy.stop(reason)
+            stop_success = await strategy.stop(reason)
+
+        except Exception as e:
+            logger.error("❌ Исключение при остановке стратегии: %s", e)
 
-            # Удаляем стратегию из памяти
+            # Критическая ошибка: удаляем стратегию из памяти
             self.strategy = None
+            self._mark_db_inactive(_MSG_STOP_ERROR.format(e))
 
-            if stop_success:
-                logger.info(f"✅ Стратегия {strategy_name} успешно остановлена")
+            return _response(_ERROR_TEMPLATE, strategy_name=strategy_name, error=_MSG_STOP_ERROR.format(e))
 
-                return {
-                    'success': True,
-                    'strategy_name': strategy_name,
-                    'message': f'Стратегия {strategy_name} остановлена'
-                }
-            else:
-                logger.warning(f"⚠️ Стратегия остановлена с предупреждениями")
+        # Экземпляр остается в памяти для повторного запуска
+        self._mark_db_inactive(reason)
 
-                return {
-                    'success': True,  # Считаем успехом, даже если были предупреждения
-                    'strategy_name': strategy_name,
-                    'message': f'Стратегия {strategy_name} остановлена (с предупреждениями)'
-                }
+        if stop_success:
+            logger.info("✅ Стратегия %s успешно остановлена", strategy_name)
 
-        except Exception as e:
-            logger.error(f"❌ Исключение при остановке стратегии: {e}")
+            return _response(
+                _STOP_OK_TEMPLATE,
+                strategy_name=strategy_name,
+                message=_MSG_STOPPED.format(strategy_name)
+            )
 
-            # Все равно удаляем стратегию из памяти
-            strategy_name = self.strategy.strategy_name if self.strategy else "неизвестная"
-            self.strategy = None
+        logger.warning("⚠️ Стратегия остановлена с предупреждениями")
 
-            return {
-                'success': False,
-                'strategy_name': strategy_name,
-                'error': f'Ошибка остановки: {str(e)}'
-            }
+        # Считаем успехом, даже если были предупреждения
+        return _response(
+            _STOP_OK_TEMPLATE,
+            strategy_name=strategy_name,
+            message=_MSG_STOPPED_WITH_WARNINGS.format(strategy_name)
+        )
+
+    def _mark_db_active(self, strategy_name: str) -> bool:
+        """Отметка активной стратегии в БД (ошибка БД только логируется)"""
+        try:
+            db.set_strategy_active(strategy_name)
+            return True
+        except Exception as e:
+            logger.error("❌ Не удалось записать статус стратегии в БД: %s", e)
+            return False
+        finally:
+            self._invalidate_db_status()
+
+    def _mark_db_inactive(self, reason: str) -> bool:
+        """Отметка остановленной стратегии в БД (ошибка БД только логируется)"""
+        try:
+            db.set_strategy_inactive(reason)
+            return True
+        except Exception as e:
+            logger.error("❌ Не удалось записать статус стратегии в БД: %s", e)
+            return False
+        finally:
+            self._invalidate_db_status()
 
     def get_strategy(self) -> Optional[MACDStrategy]:
         """Получение активной стратегии"""
-        return self.strategy
+        return self.get_if_active()
+
+    def get_if_active(self) -> Optional[MACDStrategy]:
+        """Стратегия, если она запущена и активна, иначе None"""
+        strategy = self.strategy
+        if strategy is not None and strategy.is_active:
+            return strategy
+        return None
 
     def is_strategy_active(self) -> bool:
         """Проверка активности стратегии"""
-        return self.strategy is not None and self.strategy.is_active
+        return self.get_if_active() is not None
 
     def get_strategy_status(self) -> Dict[str, Any]:
         """Получение статуса стратегии"""
-        if self.strategy is None:
+        strategy = self.get_if_active()
+        if strategy is None:
+            db_status = self._get_db_status_cached()
             return {
                 'is_active': False,
                 'strategy_name': None,
-                'status': 'not_running'
+                'status': 'not_running',
+                'db_is_active': bool(db_status.get('is_active'))
             }
 
         # Получаем статус из активной стратегии
-        status_info = self.strategy.get_status_info()
+        status_info = strategy.get_status_info()
         status_info['in_memory'] = True
 
         return status_info
 
+    async def cleanup_and_sync_with_db(self) -> None:
+        """Синхронизация статуса стратегии в БД с состоянием в памяти"""
+        try:
+            memory_is_active = self.is_strategy_active()
+
+            # Чтение и исправление статуса одной транзакцией
+            with db.transaction():
+                db_status = db.get_strategy_status()
+                db_is_active = bool(db_status.get('is_active'))
+
+                if db_is_active and not memory_is_active:
+                    logger.warning("⚠️ В БД стратегия отмечена активной, но не запущена - синхронизируем")
+                    db.set_strategy_inactive("Sync: strategy is not running")
+                elif memory_is_active and not db_is_active:
+                    logger.warning("⚠️ Стратегия запущена, но в БД отмечена неактивной - синхронизируем")
+                    db.set_strategy_active(self.strategy.strategy_name)
+
+            self._invalidate_db_status()
+
+        except Exception as e:
+            logger.error("❌ Ошибка синхронизации с БД: %s", e)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Сводная статистика: стратегия, сделки и конфигурация"""
+        return {
+            'strategy': self.get_strategy_status(),
+            'trading': db.get_statistics(),
+            'config': dict(CONFIG_SUMMARY)
+        }
+
     async def restart_strategy(self, reason: str = "Restart requested") -> Dict[str, Any]:
         """Перезапуск стратегии"""
-        logger.info(f"🔄 Перезапуск стратегии: {reason}")
+        logger.info("🔄 Перезапуск стратегии: %s", reason)
 
         # Сначала останавливаем если запущена
         if self.is_strategy_active():
             stop_result = await self.stop_strategy(f"Restart: {reason}")
             if not stop_result['success']:
-                return {
-                    'success': False,
-                    'error': f"Не удалось остановить для перезапуска: {stop_result['error']}"
-                }
+                return _response(_ERROR_TEMPLATE, error=_MSG_RESTART_STOP_FAILED.format(stop_result['error']))
 
         # Затем запускаем
         start_result = await self.start_strategy()
         if start_result['success']:
-            start_result['message'] = f"Стратегия перезапущена: {reason}"
+            start_result['message'] = _MSG_RESTARTED.format(reason)
 
         return start_result
 
     def print_status(self):
-        """Вывод статуса в консоль"""
-        print("\n" + "=" * 70)
-        print("СТАТУС МЕНЕДЖЕРА СТРАТЕГИЙ")
-        print("=" * 70)
+        """Вывод статуса в консоль одной записью"""
+        lines = ["", _STATUS_SEPARATOR, "СТАТУС МЕНЕДЖЕРА СТРАТЕГИЙ", _STATUS_SEPARATOR]
 
         # Статус стратегии
-        if self.strategy:
-            print(f"Активная стратегия: 🟢 {self.strategy.strategy_name}")
-            self.strategy.print_status()
+        strategy = self.get_if_active()
+        if strategy:
+            lines.append(f"Активная стратегия: 🟢 {strategy.strategy_name}")
+            lines.extend(strategy.get_status_lines())
         else:
-            print("Активная стратегия: 🔴 Нет")
+            lines.append("Активная стратегия: 🔴 Нет")
+
+        db_status = self._get_db_status_cached()
+        lines.append(f"Статус в БД: {'🟢 АКТИВНА' if db_status.get('is_active') else '🔴 ОСТАНОВЛЕНА'}")
 
         # Конфигурация
-        print(f"\n⚙️ КОНФИГУРАЦИЯ:")
-        print(f"Символ: {config.trading_pair}")
-        print(f"Таймфрейм: {config.timeframe}")
-        print(f"Плечо: {config.leverage}x")
-        print(f"Размер позиции: {config.position_size_usdt} USDT")
+        lines.extend(_CONFIG_STATUS_LINES)
+        lines.append(_STATUS_SEPARATOR)
 
-        print("=" * 70)
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 # Глобальный экземпляр менеджера стратегий
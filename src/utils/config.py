@@ -1,13 +1,24 @@
 # src/utils/config.py
 import os
 from dataclasses import dataclass
-from typing import Optional
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Dict, Optional
+from dotenv import dotenv_values
 
-load_dotenv()
+# Поддерживаемые таймфреймы стратегии
+SUPPORTED_TIMEFRAMES = frozenset({"5m", "45m"})
 
 
-@dataclass
+@lru_cache(maxsize=1)
+def _loaded_env() -> Dict[str, str]:
+    """Переменные из .env, поверх которых переменные окружения процесса (читается один раз)"""
+    # Как и load_dotenv(): уже заданные переменные окружения не перекрываются, ключи без значения пропускаются
+    env = {key: value for key, value in dotenv_values().items() if value is not None}
+    env.update(os.environ)
+    return env
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
     """Конфигурация торгового скрипта без Telegram"""
 
@@ -31,13 +42,15 @@ class Config:
     environment: str = "production"  # production или testnet
 
     @classmethod
+    @lru_cache(maxsize=1)
     def from_env(cls) -> "Config":
-        """Создание конфигурации из переменных окружения"""
+        """Создание конфигурации из переменных окружения (результат кэшируется)"""
+        env = _loaded_env()
 
         # Обязательные параметры
-        bybit_api_key = os.getenv("BYBIT_API_KEY", "")
-        bybit_secret_key = os.getenv("BYBIT_SECRET_KEY", "")
-        trading_pair = os.getenv("TRADING_PAIR", "")
+        bybit_api_key = env.get("BYBIT_API_KEY", "")
+        bybit_secret_key = env.get("BYBIT_SECRET_KEY", "")
+        trading_pair = env.get("TRADING_PAIR", "")
 
         if not bybit_api_key:
             raise ValueError("BYBIT_API_KEY не найден в переменных окружения")
@@ -48,20 +61,20 @@ class Config:
 
         # Парсим leverage
         try:
-            leverage = int(os.getenv("LEVERAGE", "5"))
+            leverage = int(env.get("LEVERAGE", "5"))
             if not (3 <= leverage <= 10):
                 raise ValueError("LEVERAGE должно быть от 3 до 10")
         except ValueError as e:
             raise ValueError(f"Некорректное значение LEVERAGE: {e}")
 
         # Парсим timeframe
-        timeframe = os.getenv("TIMEFRAME", "5m")
-        if timeframe not in ["5m", "45m"]:
+        timeframe = env.get("TIMEFRAME", "5m")
+        if timeframe not in SUPPORTED_TIMEFRAMES:
             raise ValueError("TIMEFRAME должен быть '5m' или '45m'")
 
         # Парсим размер позиции (только USDT)
         try:
-            position_size_usdt = float(os.getenv("POSITION_SIZE_USDT", "15"))
+            position_size_usdt = float(env.get("POSITION_SIZE_USDT", "15"))
             if position_size_usdt <= 0:
                 raise ValueError("POSITION_SIZE_USDT должен быть больше 0")
         except ValueError as e:
@@ -74,9 +87,9 @@ class Config:
             leverage=leverage,
             timeframe=timeframe,
             position_size_usdt=position_size_usdt,
-            database_url=os.getenv("DATABASE_URL", "sqlite:///trading_bot.db"),
-            log_level=os.getenv("LOG_LEVEL", "INFO"),
-            environment=os.getenv("ENVIRONMENT", "production")
+            database_url=env.get("DATABASE_URL", "sqlite:///trading_bot.db"),
+            log_level=env.get("LOG_LEVEL", "INFO"),
+            environment=env.get("ENVIRONMENT", "production")
         )
 
     def validate(self) -> bool:
@@ -119,4 +132,12 @@ class Config:
 
 
 # Глобальный экземпляр конфигурации
-config = Config.from_env()
\ No newline at end of file
+config = Config.from_env()
+
+# Сводка торговых настроек для ответов менеджера стратегий (конфигурация неизменна)
+CONFIG_SUMMARY = {
+    'symbol': config.trading_pair,
+    'timeframe': config.timeframe,
+    'leverage': config.leverage,
+    'position_size': config.get_position_size_display()
+}
\ No newline at end of file
@@ -1,6 +1,8 @@
 # src/utils/helpers.py
-from typing import Union
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Union
 from datetime import datetime, timezone, timedelta
+import numpy as np
 
 # Московская временная зона (UTC+3)
 MSK_TIMEZONE = timezone(timedelta(hours=3))
@@ -66,33 +68,56 @@ def format_utc_to_msk(utc_timestamp: Union[int, float], format_str: str = "%H:%M
     return msk_time.strftime(format_str)
 
 
+def _to_float(value: Union[float, int, str]) -> float:
+    """Приведение значения к float (float возвращается без преобразования)"""
+    return value if value.__class__ is float else float(value)
+
+
+@lru_cache(maxsize=32)
+def _make_formatter(precision: int, grouping: bool, strip: bool) -> Callable[[float], str]:
+    """
+    Готовый форматтер числа для заданной точности (кэшируется, строка формата собирается один раз)
+
+    Args:
+        precision: Знаков после запятой
+        grouping: Разделители тысяч
+        strip: Убирать лишние нули в дробной части
+    """
+    spec = f"{{:{',' if grouping else ''}.{precision}f}}".format
+    if strip:
+        return lambda value: spec(value).rstrip('0').rstrip('.')
+    return spec
+
+
 def format_balance(balance: Union[float, int, str]) -> str:
     """
     Форматирование баланса для отображения с разделителями тысяч
     """
+    # Быстрый путь для самого частого случая: положительный float от 0.01
+    if type(balance) is float:
+        if balance >= 1000:
+            return format(balance, ",.2f")
+        if balance >= 0.01:
+            return format(balance, ".2f")
+
     try:
-        # Преобразуем в float если это строка
-        if isinstance(balance, str):
-            balance = float(balance)
-        elif isinstance(balance, int):
-            balance = float(balance)
+        value = _to_float(balance)
 
         # Обрабатываем отрицательные значения
-        is_negative = balance < 0
-        abs_balance = abs(balance)
+        is_negative = value < 0
+        abs_balance = abs(value)
 
         # Для очень маленьких значений (меньше 0.01) показываем больше знаков
         if 0 < abs_balance < 0.01:
-            if abs_balance >= 0.001:
-                formatted = f"{abs_balance:.5f}".rstrip('0').rstrip('.')
-            else:
-                formatted = f"{abs_balance:.8f}".rstrip('0').rstrip('.')
+            formatter = _make_formatter(5 if abs_balance >= 0.001 else 8, False, True)
         # Для больших значений используем разделители тысяч
         elif abs_balance >= 1000:
-            formatted = f"{abs_balance:,.2f}"
+            formatter = _make_formatter(2, True, False)
         # Для обычных значений стандартное форматирование
         else:
-            formatted = f"{abs_balance:.2f}"
+            formatter = _make_formatter(2, False, False)
+
+        formatted = formatter(abs_balance)
 
         # Добавляем знак минус обратно если было отрицательное значение
         if is_negative:
@@ -146,10 +171,7 @@ def format_percentage(value: Union[float, int, str], decimal_places: int = 2) ->
         format_percentage(0.123, 3) -> "0.123%"
     """
     try:
-        if isinstance(value, str):
-            value = float(value)
-        elif isinstance(value, int):
-            value = float(value)
+        value = _to_float(value)
 
         return f"{value:.{decimal_places}f}%"
 
@@ -157,6 +179,11 @@ def format_percentage(value: Union[float, int, str], decimal_places: int = 2) ->
         return f"{value}%"
 
 
+# Эмодзи и знак P&L по индексу (отрицательный, ноль, положительный)
+_PNL_EMOJI = ("💔", "💙", "💚")
+_PNL_SIGN = ("", "", "+")
+
+
 def format_pnl(pnl: Union[float, int, str], with_currency: bool = True, with_sign: bool = True) -> str:
     """
     Форматирование P&L с правильными знаками и цветовыми эмодзи
@@ -175,28 +202,14 @@ def format_pnl(pnl: Union[float, int, str], with_currency: bool = True, with_sig
         format_pnl(0) -> "💙 0.00 USDT"
     """
     try:
-        if isinstance(pnl, str):
-            pnl = float(pnl)
-        elif isinstance(pnl, int):
-            pnl = float(pnl)
-
-        # Выбираем эмодзи в зависимости от значения
-        if pnl > 0:
-            emoji = "💚"
-            sign = "+" if with_sign else ""
-        elif pnl < 0:
-            emoji = "💔"
-            sign = ""  # Минус уже включен в число
-        else:
-            emoji = "💙"
-            sign = ""
+        pnl = _to_float(pnl)
 
-        formatted_amount = format_balance(abs(pnl) if pnl > 0 else pnl)
+        # Выбираем эмодзи и знак по знаку значения (минус уже включен в число)
+        index = (pnl > 0) - (pnl < 0) + 1
+        sign = _PNL_SIGN[index] if with_sign else ""
+        currency = " USDT" if with_currency else ""
 
-        if with_currency:
-            return f"{emoji} {sign}{formatted_amount} USDT"
-        else:
-            return f"{emoji} {sign}{formatted_amount}"
+        return f"{_PNL_EMOJI[index]} {sign}{format_balance(pnl)}{currency}"
 
     except (ValueError, TypeError):
         return f"💙 {pnl}"
@@ -219,10 +232,7 @@ def format_quantity(quantity: Union[float, int, str], precision: int = 8) -> str
         format_quantity(1000) -> "1,000"
     """
     try:
-        if isinstance(quantity, str):
-            quantity = float(quantity)
-        elif isinstance(quantity, int):
-            quantity = float(quantity)
+        quantity = _to_float(quantity)
 
         # Для целых чисел
         if quantity == int(quantity):
@@ -241,6 +251,20 @@ def format_quantity(quantity: Union[float, int, str], precision: int = 8) -> str
         return str(quantity)
 
 
+# Точность цены для дорогих активов (BTC, ETH) - 2 знака
+_PRICE_PRECISION = {"BTC": 2, "ETH": 2, "BNB": 2}
+
+
+def _symbol_precision(symbol: str) -> Optional[int]:
+    """Точность цены для пары или None, если она зависит от величины цены"""
+    symbol = symbol.upper()
+    if not symbol.endswith("USDT"):
+        # По умолчанию
+        return 4
+
+    return _PRICE_PRECISION.get(symbol[:-4])
+
+
 def format_price(price: Union[float, int, str], symbol: str = "") -> str:
     """
     Форматирование цены в зависимости от торговой пары
@@ -257,37 +281,78 @@ def format_price(price: Union[float, int, str], symbol: str = "") -> str:
         format_price(0.00123, "ADAUSDT") -> "0.00123"
     """
     try:
-        if isinstance(price, str):
-            price = float(price)
-        elif isinstance(price, int):
-            price = float(price)
+        price = _to_float(price)
 
         # Определяем точность в зависимости от пары
-        if symbol.upper().endswith("USDT"):
-            base_asset = symbol.upper().replace("USDT", "")
-
-            # Для дорогих активов (BTC, ETH) - 2 знака
-            if base_asset in ["BTC", "ETH", "BNB"]:
-                precision = 2
+        precision = _symbol_precision(symbol)
+        if precision is None:
             # Для дешевых активов - больше знаков
-            elif price < 1:
-                precision = 6
-            else:
-                precision = 4
-        else:
-            # По умолчанию
-            precision = 4
+            precision = 6 if price < 1 else 4
 
-        # Форматируем с нужной точностью
-        if price >= 1000:
-            return f"{price:,.{precision}f}".rstrip('0').rstrip('.')
-        else:
-            return f"{price:.{precision}f}".rstrip('0').rstrip('.')
+        # Форматируем с нужной точностью (разделители тысяч от 1000)
+        return _make_formatter(precision, price >= 1000, True)(price)
 
     except (ValueError, TypeError):
         return str(price)
 
 
+def format_balances(balances: Iterable[Union[float, int]]) -> List[str]:
+    """
+    Форматирование списка балансов за один проход (то же, что format_balance для каждого)
+
+    Args:
+        balances: Балансы (список или numpy массив)
+
+    Returns:
+        Список отформатированных строк
+    """
+    values = np.asarray(balances, dtype=float)
+    abs_values = np.abs(values)
+
+    # Диапазон величины для каждого значения - одной операцией над массивом
+    buckets = np.select(
+        [(abs_values > 0) & (abs_values < 0.001), (abs_values > 0) & (abs_values < 0.01), abs_values >= 1000],
+        [0, 1, 2],
+        default=3
+    )
+    formatters = (
+        _make_formatter(8, False, True),
+        _make_formatter(5, False, True),
+        _make_formatter(2, True, False),
+        _make_formatter(2, False, False)
+    )
+
+    return [
+        f"-{formatters[bucket](value)}" if negative else formatters[bucket](value)
+        for value, bucket, negative in zip(abs_values.tolist(), buckets.tolist(), (values < 0).tolist())
+    ]
+
+
+def format_prices(prices: Iterable[Union[float, int]], symbol: str = "") -> List[str]:
+    """
+    Форматирование списка цен одной пары за один проход (то же, что format_price для каждой)
+
+    Args:
+        prices: Цены (список или numpy массив)
+        symbol: Торговая пара (например, BTCUSDT)
+
+    Returns:
+        Список отформатированных строк
+    """
+    values = np.asarray(prices, dtype=float)
+
+    precision = _symbol_precision(symbol)
+    if precision is None:
+        precisions = np.where(values < 1, 6, 4).tolist()
+    else:
+        precisions = [precision] * len(values)
+
+    return [
+        _make_formatter(value_precision, grouping, True)(value)
+        for value, value_precision, grouping in zip(values.tolist(), precisions, (values >= 1000).tolist())
+    ]
+
+
 def get_balance_emoji(balance: Union[float, int, str]) -> str:
     """
     Получение эмодзи в зависимости от размера баланса
@@ -299,10 +364,7 @@ def get_balance_emoji(balance: Union[float, int, str]) -> str:
         Эмодзи для баланса
     """
     try:
-        if isinstance(balance, str):
-            balance = float(balance)
-        elif isinstance(balance, int):
-            balance = float(balance)
+        balance = _to_float(balance)
 
         if balance >= 10000:
             return "💎"  # Большой баланс
@@ -339,6 +401,21 @@ def truncate_string(text: str, max_length: int = 100, suffix: str = "...") -> st
     return text[:max_length - len(suffix)] + suffix
 
 
+# Формы слов для русских числительных: (1 час, 2 часа, 5 часов)
+_WEEK_FORMS = ("неделя", "недели", "недель")
+_DAY_FORMS = ("день", "дня", "дней")
+_HOUR_FORMS = ("час", "часа", "часов")
+
+
+def _ru_plural(n: int) -> int:
+    """Индекс формы слова для числа n по правилам русского языка"""
+    if n % 10 == 1 and n % 100 != 11:
+        return 0
+    if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+        return 1
+    return 2
+
+
 def format_duration(hours: Union[int, float]) -> str:
     """
     Форматирование продолжительности в удобочитаемый вид
@@ -355,28 +432,21 @@ def format_duration(hours: Union[int, float]) -> str:
         format_duration(36) -> "1 день 12 часов"
     """
     try:
-        hours = int(hours)
-
-        if hours == 0:
-            return "0 часов"
-
-        weeks = hours // 168
-        days = (hours % 168) // 24
-        remaining_hours = hours % 24
+        weeks, rest = divmod(int(hours), 168)
+        days, remaining_hours = divmod(rest, 24)
 
         parts = []
 
         if weeks > 0:
-            parts.append(f"{weeks} {'неделя' if weeks == 1 else 'недель' if weeks < 5 else 'недель'}")
+            parts.append(f"{weeks} {_WEEK_FORMS[_ru_plural(weeks)]}")
 
         if days > 0:
-            parts.append(f"{days} {'день' if days == 1 else 'дня' if days < 5 else 'дней'}")
+            parts.append(f"{days} {_DAY_FORMS[_ru_plural(days)]}")
 
         if remaining_hours > 0:
-            parts.append(
-                f"{remaining_hours} {'час' if remaining_hours == 1 else 'часа' if remaining_hours < 5 else 'часов'}")
+            parts.append(f"{remaining_hours} {_HOUR_FORMS[_ru_plural(remaining_hours)]}")
 
-        return " ".join(parts)
+        return " ".join(parts) or "0 часов"
 
     except (ValueError, TypeError):
         return f"{hours} часов"
\ No newline at end of file
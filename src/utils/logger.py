@@ -1,22 +1,60 @@
 # src/utils/logger.py
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 from .config import config
 from .helpers import MSK_TIMEZONE
 
+# Ротация bot.log, errors.log и trading.log: при превышении размера файл уходит в .log.1 ... .log.3
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Ротированные файлы логов (bot.log.1, errors.log.2 и т.д.)
+_ROTATED_LOG_RE = re.compile(r"\.log\.\d+$")
+
+# Устанавливаем UTF-8 для консоли Windows (один раз при импорте)
+if sys.platform == "win32" and hasattr(sys.stdout, 'reconfigure'):
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except (AttributeError, OSError):
+        # Fallback для старых версий Python или системных ограничений
+        pass
+
 
 class MSKFormatter(logging.Formatter):
     """Форматтер с московским временем"""
 
+    # Последнее отформатированное время: (секунда, формат, строка).
+    # Хранится одним кортежем, чтобы потоки не видели частично обновленный кэш
+    _last_formatted = (-1, None, "")
+
     def formatTime(self, record, datefmt=None):
+        # Записи в пределах одной секунды получают одну и ту же строку времени
+        sec = int(record.created)
+        last_sec, last_fmt, last_str = self._last_formatted
+        if sec == last_sec and datefmt == last_fmt:
+            return last_str
+
         # Конвертируем время записи в московское время
-        dt = datetime.fromtimestamp(record.created, tz=MSK_TIMEZONE)
-        if datefmt:
-            return dt.strftime(datefmt)
-        else:
-            return dt.strftime('%Y-%m-%d %H:%M:%S MSK')
+        dt = datetime.fromtimestamp(sec, tz=MSK_TIMEZONE)
+        formatted = dt.strftime(datefmt or '%Y-%m-%d %H:%M:%S MSK')
+        self._last_formatted = (sec, datefmt, formatted)
+        return formatted
+
+
+@lru_cache(maxsize=None)
+def _ensure_log_dir() -> Path:
+    """Директория логов (создается один раз за процесс)"""
+    log_dir = Path("logs")
+    log_dir.mkdir(exist_ok=True)
+    return log_dir
 
 
 def setup_logger(name: str = __name__) -> logging.Logger:
@@ -39,60 +77,84 @@ def setup_logger(name: str = __name__) -> logging.Logger:
     # === КОНСОЛЬНЫЙ ВЫВОД ===
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-
-    # Устанавливаем UTF-8 для Windows
-    if sys.platform == "win32" and hasattr(console_handler.stream, 'reconfigure'):
-        try:
-            console_handler.stream.reconfigure(encoding='utf-8')
-        except (AttributeError, OSError):
-            # Fallback для старых версий Python или системных ограничений
-            pass
-
     logger.addHandler(console_handler)
 
     # === ФАЙЛОВОЕ ЛОГИРОВАНИЕ ===
+    # Файловые обработчики работают в фоновом потоке QueueListener,
+    # логгер только кладет записи в очередь
+    file_handlers = []
+    memory_handler = None
     try:
         # Создаем директорию для логов
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
+        log_dir = _ensure_log_dir()
 
         # Основной файл логов
         main_log_file = log_dir / "bot.log"
-        file_handler = logging.FileHandler(main_log_file, encoding='utf-8')
+        file_handler = logging.handlers.RotatingFileHandler(
+            main_log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
         file_handler.setFormatter(formatter)
 
         # Устанавливаем уровень для файла - можно сделать более детальным
         file_handler.setLevel(logging.INFO)
-        logger.addHandler(file_handler)
+
+        # Копим записи основного лога в памяти: запись в файл пачкой по 256 или сразу при ошибке
+        memory_handler = logging.handlers.MemoryHandler(
+            capacity=256, flushLevel=logging.ERROR, target=file_handler
+        )
+        memory_handler.setLevel(logging.INFO)
+        file_handlers.append(memory_handler)
 
         # === ДОПОЛНИТЕЛЬНЫЕ ФАЙЛЫ ЛОГОВ ===
 
-        # Лог только ошибок
+        # Лог только ошибок (файлы ошибок и сделок открываются при первой записи)
         error_log_file = log_dir / "errors.log"
-        error_handler = logging.FileHandler(error_log_file, encoding='utf-8')
+        error_handler = logging.handlers.RotatingFileHandler(
+            error_log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True
+        )
         error_handler.setFormatter(formatter)
         error_handler.setLevel(logging.ERROR)
-        logger.addHandler(error_handler)
+        file_handlers.append(error_handler)
 
         # Лог торговых операций (только INFO+ с ключевыми словами)
         trade_log_file = log_dir / "trading.log"
-        trade_handler = TradingLogHandler(trade_log_file)
+        trade_handler = TradingLogHandler(
+            trade_log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
+        )
         trade_handler.setFormatter(formatter)
-        trade_handler.setLevel(logging.INFO)
-        logger.addHandler(trade_handler)
+        file_handlers.append(trade_handler)
 
     except (OSError, PermissionError) as e:
         # Если не можем создать файлы логов - продолжаем только с консольным выводом
         logger.warning(f"⚠️ Не удалось настроить файловое логирование: {e}")
 
+    if file_handlers:
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+        listener = logging.handlers.QueueListener(log_queue, *file_handlers, respect_handler_level=True)
+        listener.start()
+
+        # При выходе (atexit вызывает в обратном порядке): сначала останавливаем
+        # слушатель с дописыванием очереди, затем сбрасываем буфер в bot.log
+        if memory_handler is not None:
+            atexit.register(memory_handler.flush)
+        atexit.register(listener.stop)
+
     return logger
 
 
-class TradingLogHandler(logging.FileHandler):
-    """Специальный обработчик для логирования торговых операций"""
+class TradingLogHandler(logging.handlers.RotatingFileHandler):
+    """Специальный обработчик для логирования торговых операций (с ротацией по размеру, как bot.log)"""
 
-    def __init__(self, filename, mode='a', encoding='utf-8', delay=False):
-        super().__init__(filename, mode, encoding, delay)
+    def __init__(self, filename, mode='a', maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                 encoding='utf-8', delay=False):
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+
+        # Торговые сообщения пишутся только с уровня INFO: записи ниже отсекаются
+        # еще до вызова emit (по уровню обработчика), а в emit - первой проверкой
+        self._threshold = logging.INFO
+        self.setLevel(self._threshold)
 
         # Ключевые слова для торговых операций
         self.trading_keywords = [
@@ -112,14 +174,20 @@ class TradingLogHandler(logging.FileHandler):
             'Баланс счёта'
         ]
 
+        # Одно регулярное выражение вместо проверки каждого ключевого слова по отдельности
+        self._pattern = re.compile("|".join(map(re.escape, self.trading_keywords)))
+
     def emit(self, record):
         """Записываем только торговые сообщения"""
-        if record.levelno >= logging.INFO:
-            message = record.getMessage()
+        if record.levelno < self._threshold:
+            return
+
+        # Без аргументов сообщение не нужно форматировать (записи из очереди уже отформатированы)
+        message = record.getMessage() if record.args else str(record.msg)
 
-            # Проверяем содержит ли сообщение торговые ключевые слова
-            if any(keyword in message for keyword in self.trading_keywords):
-                super().emit(record)
+        # Проверяем содержит ли сообщение торговые ключевые слова
+        if self._pattern.search(message):
+            super().emit(record)
 
 
 def get_logger_stats() -> dict:
@@ -131,13 +199,16 @@ def get_logger_stats() -> dict:
 
         stats = {}
 
-        # Размеры файлов логов
-        for log_file in log_dir.glob("*.log"):
-            try:
-                size_mb = log_file.stat().st_size / (1024 * 1024)
-                stats[log_file.name] = f"{size_mb:.2f} MB"
-            except OSError:
-                stats[log_file.name] = "недоступен"
+        # Размеры файлов логов (stat из DirEntry без отдельного системного вызова)
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".log"):
+                    continue
+                try:
+                    size_mb = entry.stat(follow_symlinks=False).st_size / (1024 * 1024)
+                    stats[entry.name] = f"{size_mb:.2f} MB"
+                except OSError:
+                    stats[entry.name] = "недоступен"
 
         return stats
 
@@ -153,16 +224,19 @@ def cleanup_old_logs(days_to_keep: int = 7):
             return
 
         from datetime import datetime, timedelta
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+        cutoff_timestamp = (datetime.now() - timedelta(days=days_to_keep)).timestamp()
 
         cleaned_count = 0
-        for log_file in log_dir.glob("*.log.*"):  # Ротированные логи (.log.1, .log.2 и т.д.)
-            try:
-                if datetime.fromtimestamp(log_file.stat().st_mtime) < cutoff_date:
-                    log_file.unlink()
-                    cleaned_count += 1
-            except OSError:
-                continue
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                if not _ROTATED_LOG_RE.search(entry.name):
+                    continue
+                try:
+                    if entry.stat(follow_symlinks=False).st_mtime < cutoff_timestamp:
+                        os.unlink(entry.path)
+                        cleaned_count += 1
+                except OSError:
+                    continue
 
         if cleaned_count > 0:
             logger = logging.getLogger(__name__)
@@ -173,43 +247,11 @@ def cleanup_old_logs(days_to_keep: int = 7):
         logger.error(f"❌ Ошибка очистки логов: {e}")
 
 
-def rotate_logs_if_needed():
-    """НОВАЯ ФУНКЦИЯ: Ротация логов при превышении размера"""
-    try:
-        log_dir = Path("logs")
-        if not log_dir.exists():
-            return
-
-        max_size_mb = 10  # Максимальный размер файла лога в MB
-        max_size_bytes = max_size_mb * 1024 * 1024
-
-        for log_file in log_dir.glob("*.log"):
-            try:
-                if log_file.stat().st_size > max_size_bytes:
-                    # Простая ротация - переименовываем в .log.old
-                    old_log = log_file.with_suffix('.log.old')
-                    if old_log.exists():
-                        old_log.unlink()  # Удаляем старый бэкап
-
-                    log_file.rename(old_log)
-
-                    logger = logging.getLogger(__name__)
-                    logger.info(f"🔄 Ротирован лог файл: {log_file.name} (размер превысил {max_size_mb}MB)")
-
-            except OSError:
-                continue
-
-    except Exception as e:
-        logger = logging.getLogger(__name__)
-        logger.error(f"❌ Ошибка ротации логов: {e}")
-
-
 # Основной логгер для использования в проекте
 logger = setup_logger("macd_bot")
 
-# Инициализация - проверяем и ротируем логи при запуске
+# Инициализация - удаляем старые ротированные логи при запуске
 try:
-    rotate_logs_if_needed()
     cleanup_old_logs(days_to_keep=7)  # Храним логи 7 дней
 except Exception:
     # Не критично если не получилось